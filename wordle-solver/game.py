@@ -37,6 +37,22 @@ class Game:
             result, endgame = wordle.check_guess(guess)    
             print(result)
         return result, guesses
+
+    def simulate(self, wordle, guesser, answer=None):
+        """
+        Play and score a full game, returning whether the word was guessed, the number of guesses and the time taken.
+        """
+        start_time = time.time()
+
+        # reset game
+        guesser.restart_game()
+        wordle.restart_game(word=answer)
+
+        # play the game
+        result, guesses = self.game(wordle, guesser)
+        self.score(result, guesses)
+
+        return self.RESULTS[-1], guesses, time.time() - start_time
             
 def main():
     # set up command line arguments
@@ -63,17 +79,9 @@ def main():
             blockPrint()
 
         for run in range(args.r):
-            # reset game
-            guesser.restart_game()
-            wordle.restart_game()
-
-            # play the game
-            results, guesses = game.game(wordle, guesser)
+            game.simulate(wordle, guesser)
             print()
 
-            # score the game
-            game.score(results, guesses)
-
         enablePrint()
 
         # print results if --p is set
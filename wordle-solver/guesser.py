@@ -1,13 +1,24 @@
-from random import random
+from random import choices, sample
+import string
+import hashlib
+import os
 import yaml
 from rich.console import Console
-from collections import Counter
 import numpy as np
-from itertools import product
+from concurrent.futures import ThreadPoolExecutor
+
+# Numba is optional: fall back to the NumPy kernels if it is not installed
+try:
+    from numba import njit, prange
+    import numba
+    NUMBA = True
+except ImportError:
+    NUMBA = False
 
 # ALGORITHM DETAILS:
 #
-# 1. Use a trie data structure to store the word list for faster pruning
+# 1. Store the word list as arrays (letter codes, letter bitmasks) and prune it with vectorized boolean masks;
+#    precompute its pattern matrix (cached on disk) for the entropy computations
 #
 # 2. Compute the opening word once as follows:
 #   2.1 Compute letters' position-wise frequency
@@ -25,136 +36,361 @@ from itertools import product
 #       4.2 Add it to the candidate guesses for this round (i.e., it will be selected if entropy is high enough)  
 
 
-class Trie:
-    def __init__(self):
-        self.root = {}
-        self.list = []
+# Each feedback state (0 gray, 1 yellow, 2 green) takes 2 bits of the pattern,
+# so a 5-letter pattern fits in 10 bits
+N_PATTERNS = 1024
 
-    def insert(self, word):
-        cur = self.root
-        for char in word:
-            if char not in cur:
-                cur[char] = {}
-            cur = cur[char]
-        cur["eow"] = True
-        self.list.append(word)
+# Where the precomputed word lists and pattern matrices are stored
+CACHE_DIR = ".cache"
 
-    def filter_words(self, gray, gray_pos, yellow, green_pos, guess):
-        """
-        Filters the original trie and returns a copy.
-        """
-        new_trie = Trie()
+# Tag of the logic selecting the opening word, part of its cache file name:
+# change it whenever that logic changes so that stale openings are not reused
+OPENING_VERSION = "entropy-maxgroup-solution-2"
 
-        # Pre-compute set versions of collections for faster lookups
-        gray_set = set(gray)
-        green_values = set(green_pos.values())
-        
-        def dfs(cur, current_word, yellow, new_node):
-            # Early termination for impossible words
-            current_pos = len(current_word) - 1
-            
-            # Green check
-            if current_pos in green_pos and current_word[-1] != green_pos[current_pos]:
-                return False
-
-            # Gray check
-            if current_pos in gray_pos and current_word[-1] == gray_pos[current_pos]:
-                return False
-
-            # Found a word
-            if "eow" in cur:
-                # Skip the guess word
-                if current_word == guess:
-                    return False
-                
-                # Check yellow conditions
-                for char, count in yellow.items():
-                    if count > 0 and current_word.count(char) < count:
-                        return False
-                
-                # Word passes all filters
-                new_node["eow"] = True
-                new_trie.list.append(current_word)
-                return True
+# Use the C YAML parser when libyaml is available
+YAML_LOADER = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
 
-            # Explore all children
-            valid_child = False
-            
-            # Create list of items once for performance
-            items = list(cur.items())
-            for char, next_node in items:
-                # Skip gray letters (optimization: early pruning)
-                if char in gray_set and not yellow.get(char, 0) and char not in green_values:
-                    continue
-
-                # Create child node
-                new_child = {}
-                
-                # Update yellow counts only if needed
-                if char in yellow and yellow[char] > 0:
-                    # Only copy if needed
-                    updated_yellow = yellow.copy()
-                    updated_yellow[char] -= 1
-                else:
-                    updated_yellow = yellow
-
-                # Recurse
-                if dfs(next_node, current_word + char, updated_yellow, new_child):
-                    new_node[char] = new_child
-                    valid_child = True
-
-            return valid_child
-
-        dfs(self.root, "", yellow, new_trie.root)
-        return new_trie
-
-# More efficient way to compute feedback string
-def get_matches(source, target):
-    """
-    Compute the feedback pattern encoded in 3-ary digits.
-    """
-    score = 0
-    # Precompute target characters for faster lookup
-    for i in range(len(target)):
-        if source[i] == target[i]:
-            score += 2 * (3**i)
-        elif source[i] in target:
-            score += 3**i
-    return score
+# Threads for the NumPy kernels, which release the GIL:
+# one per CPU available to this process, where the platform tells
+if hasattr(os, "sched_getaffinity"):
+    N_WORKERS = len(os.sched_getaffinity(0))
+else:
+    N_WORKERS = os.cpu_count() or 1
+
+# Thread pool, created on first use so that importing the module starts no threads
+EXECUTOR = None
+
+def set_num_threads(n_threads):
+    """
+    Limit the threads used by the kernels, e.g. when running one guesser per process.
+    """
+    global N_WORKERS, EXECUTOR
+    N_WORKERS = n_threads
+    if EXECUTOR is not None:
+        EXECUTOR.shutdown()
+        EXECUTOR = None
+    if NUMBA:
+        numba.set_num_threads(n_threads)
+
+def save_cache(path, save, *args, **kwargs):
+    """
+    Write a cache file with the given np.save-like function, through a temporary file
+    moved into place so that other processes never see it half-written.
+    """
+    os.makedirs(CACHE_DIR, exist_ok=True)
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    try:
+        with open(tmp_path, "wb") as f:
+            save(f, *args, **kwargs)
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+def parallel_map(function, items):
+    """
+    Apply the function to all items, on the thread pool if there is more than one.
+    """
+    global EXECUTOR
+    if len(items) > 1:
+        if EXECUTOR is None:
+            EXECUTOR = ThreadPoolExecutor(max_workers=N_WORKERS)
+        return list(EXECUTOR.map(function, items))
+    return [function(item) for item in items]
+
+def encode(words):
+    """
+    Encode a list of 5-letter words as a (N, 5) matrix of letter codes.
+    """
+    return np.frombuffer(''.join(words).encode(), dtype=np.uint8).reshape(-1, 5) - ord('a')
+
+def get_matches(sources, targets):
+    """
+    Compute the feedback pattern of every source against every target, encoded in 2-bit digits.
+    Returns a (len(sources), len(targets)) matrix.
+    """
+    # Green where the letters match position-wise, shape (Ns, Nt, 5)
+    green = sources[:, None, :] == targets[None, :, :]
+
+    # Yellow where the source letter appears anywhere in the target
+    present = np.zeros((len(targets), 26), dtype=bool)
+    present[np.arange(len(targets))[:, None], targets] = True
+    yellow = present[:, sources].transpose(1, 0, 2) & ~green
+
+    # Pack the states position-wise with shifts
+    patterns = np.zeros(green.shape[:2], dtype=np.uint16)
+    for i in range(5):
+        state = (green[..., i].astype(np.uint16) << 1) | yellow[..., i]
+        patterns |= state << (2 * i)
+    return patterns
+
+def get_letter_bits(letters):
+    """
+    Return the bitmask of the letters appearing in each word, with bit c set for letter code c.
+    """
+    return np.bitwise_or.reduce(np.uint32(1) << letters.astype(np.uint32), axis=1)
+
+def pack(letters):
+    """
+    Pack each row of letter codes into a single integer, e.g. to compare words.
+    """
+    return letters.astype(np.int64) @ 26 ** np.arange(5)
+
+def decode(letters):
+    """
+    Decode a row of letter codes back to a string, or a matrix of them to a list of strings.
+    """
+    text = (np.asarray(letters, dtype=np.uint8) + ord('a')).tobytes().decode()
+    if np.ndim(letters) == 1:
+        return text
+    return [text[i:i + 5] for i in range(0, len(text), 5)]
+
+def load_wordlist(path):
+    """
+    Load a word list as a (N, 5) matrix of letter codes, parsing the YAML file only on the first run.
+    """
+    with open(path, "rb") as f:
+        key = hashlib.md5(f.read()).hexdigest()[:8]
+    cache_path = os.path.join(CACHE_DIR, f"wordlist_{key}.npy")
+    if os.path.exists(cache_path):
+        return np.load(cache_path)
+
+    with open(path) as f:
+        letters = encode(yaml.load(f, Loader=YAML_LOADER))
+
+    save_cache(cache_path, np.save, letters)
+    return letters
+
+def most_common(frequency, n):
+    """
+    Return the codes of the n most frequent letters among the ones that appear, like Counter.most_common.
+    """
+    top = np.argsort(-frequency, kind='stable')[:n]
+    return [c for c in top if frequency[c] > 0]
+
+def get_combinations(letters_by_position):
+    """
+    Return all the combinations of one letter per position without repeated letters, as a matrix of letter codes.
+    """
+    combinations = np.empty((np.prod([len(letters) for letters in letters_by_position]), 5), dtype=np.uint8)
+    current = np.empty(5, dtype=np.uint8)
+    n_combinations = 0
+
+    def expand(i, used):
+        nonlocal n_combinations
+        if i == 5:
+            combinations[n_combinations] = current
+            n_combinations += 1
+            return
+        for c in letters_by_position[i]:
+            # Prune repeated letters using a bitmask of the used ones
+            if not used & (1 << c):
+                current[i] = c
+                expand(i + 1, used | (1 << c))
+
+    expand(0, 0)
+    return combinations[:n_combinations]
+
+def get_klogk(n):
+    """
+    Return the table of k*log2(k) for all the integer counts k in [0, n].
+    """
+    klogk = np.arange(n + 1, dtype=np.float64)
+    klogk[1:] *= np.log2(klogk[1:])
+    return klogk
+
+def get_entropies(patterns):
+    """
+    Compute the entropy and the size of the largest group of the pattern distribution
+    of each row of the pattern matrix.
+    """
+    n_sources, n_targets = patterns.shape
+    klogk = get_klogk(n_targets)
+
+    # Count the occurrences of each pattern row-wise with a single bincount
+    offsets = N_PATTERNS * np.arange(n_sources)[:, None]
+    counts = np.bincount((patterns + offsets).ravel(), minlength=N_PATTERNS * n_sources)
+
+    # With p = k/n, the entropy is log2(n) - sum(k*log2(k))/n:
+    # sum k*log2(k) over the observed patterns only, back into their rows
+    observed = np.flatnonzero(counts)
+    sums = np.bincount(observed // N_PATTERNS, weights=klogk[counts[observed]], minlength=n_sources)
+    max_groups = counts.reshape(n_sources, N_PATTERNS).max(axis=1)
+    return np.log2(n_targets) - sums / n_targets, max_groups
+
+def get_best(entropies, max_groups, solutions):
+    """
+    Return the index of the best source: highest entropy, then smallest largest group,
+    then one that could be the solution.
+    """
+    # Round the entropies so that equal distributions tie regardless of how they were summed
+    return np.lexsort((~solutions, max_groups, -np.round(entropies, 9)))[0]
+
+def get_ceiling(n_targets):
+    """
+    Return the highest entropy achievable on n_targets, reached when each target gets its own pattern.
+    """
+    # Only 3 of the 4 states of each digit are used
+    return np.log2(min(n_targets, 3**5))
+
+def score_words(sources, targets, chunk_size=64):
+    """
+    Compute the entropy and the size of the largest group of each source against the targets,
+    both given as letter codes.
+    Sources are scored in chunks: once one reaches the ceiling, the following ones are skipped
+    (-inf entropy, groups larger than the targets).
+    """
+    ceiling = get_ceiling(len(targets)) - 1e-9
+    klogk = get_klogk(len(targets))
+
+    def score(chunk):
+        if NUMBA:
+            return compute_entropies(sources[chunk], targets, klogk)
+        return get_entropies(get_matches(sources[chunk], targets))
+
+    # Numba already spreads each chunk over all the cores,
+    # with NumPy score one chunk per thread at a time
+    n_parallel = 1 if NUMBA else N_WORKERS
+    step = chunk_size * n_parallel
+
+    entropies = np.full(len(sources), -np.inf)
+    max_groups = np.full(len(sources), len(targets) + 1)
+    for start in range(0, len(sources), step):
+        end = min(start + step, len(sources))
+        chunks = [slice(i, i + chunk_size) for i in range(start, end, chunk_size)]
+        for chunk, (chunk_entropies, chunk_max_groups) in zip(chunks, parallel_map(score, chunks)):
+            entropies[chunk] = chunk_entropies
+            max_groups[chunk] = chunk_max_groups
+
+        if entropies[start:end].max() >= ceiling:
+            break
+    return entropies, max_groups
+
+if NUMBA:
+    @njit(cache=True)
+    def compute_pattern(source, target):
+        """
+        Compute the feedback pattern of a single source against a single target.
+        """
+        score = 0
+        for i in range(5):
+            if source[i] == target[i]:
+                score |= 2 << (2 * i)
+            else:
+                for j in range(5):
+                    if source[i] == target[j]:
+                        score |= 1 << (2 * i)
+                        break
+        return score
+
+    @njit(parallel=True, cache=True)
+    def compute_entropies(sources, targets, klogk):
+        """
+        Fused version of get_matches + get_entropies, parallelized over the sources.
+        """
+        n_sources, n_targets = len(sources), len(targets)
+        entropies = np.zeros(n_sources)
+        max_groups = np.zeros(n_sources, dtype=np.int64)
+        for i in prange(n_sources):
+            # Pattern distribution of this source
+            counts = np.zeros(N_PATTERNS, dtype=np.int32)
+            for j in range(n_targets):
+                counts[compute_pattern(sources[i], targets[j])] += 1
+
+            total = 0.0
+            for count in counts:
+                total += klogk[count]
+            entropies[i] = np.log2(n_targets) - total / n_targets
+            max_groups[i] = counts.max()
+        return entropies, max_groups
 
 class Guesser:
     def __init__(self, manual):
-        # Load word list once
-        with open("wordlist.yaml") as f:
-            self._word_list = yaml.load(f, Loader=yaml.FullLoader)
+        # Load word list once, as a matrix of letter codes
+        self._letters = load_wordlist("wordlist.yaml")
             
         self._manual = manual
         self.console = Console()
         self._tried = []
         
-        # Build trie once at initialization
-        self._word_trie = Trie()
-        for word in self._word_list:
-            self._word_trie.insert(word)
-        
-        # Initialize pattern cache
-        self._pattern_cache = {}
+        # Letters appearing in each word, and pattern matrix of the word list
+        self._key = hashlib.md5((self._letters + ord('a')).tobytes()).hexdigest()[:8]
+        self._has = get_letter_bits(self._letters)
+        self._P = self.load_pattern_matrix()
+
+        # Remaining candidates, as a mask over the word list (or the subset we play on)
+        self._base_mask = np.ones(len(self._letters), dtype=bool)
+        self._mask = self._base_mask.copy()
+        self._ids = np.flatnonzero(self._mask)
         
+        # Letters hit (green or yellow) in the last feedback
+        self._hits = np.zeros(26, dtype=np.int8)
+
         # Word frequencies
-        self.letter_frequency_abs = Counter()
-        self.letter_frequency_pos = {}
+        self.letter_frequency_abs = np.zeros(26, dtype=int)
+        self.letter_frequency_pos = np.zeros((5, 26), dtype=int)
         
         # Calculate opening word once
+        self._frequency_guesses = {}
         self._tried_letter = set()
-        self.word_list = self._word_list
-        self.update_frequencies()
-        self.opening = self.frequency_guess_non_word()
+        self.opening = self.load_opening()
         
     def restart_game(self):
         self._tried = []
         self._tried_letter = set(self.opening)
-        self.word_list = self._word_list
-        self.word_trie = None
+        self._mask[:] = self._base_mask
+        self._ids = np.flatnonzero(self._mask)
+
+    @property
+    def word_list(self):
+        """
+        The remaining words, materialized from their indices when needed.
+        """
+        return decode(self._letters[self._ids])
+
+    def set_word_list(self, words):
+        """
+        Restrict the game to a subset of the word list and recompute the opening word on it.
+        """
+        self._base_mask[:] = np.isin(pack(self._letters), pack(encode(words)))
+        self.restart_game()
+        self.update_frequencies()
+        self.opening = self.frequency_guess_non_word()
+
+    def load_opening(self, top_k=3):
+        """
+        Load the opening word of the word list from disk, computing it on the first run.
+        """
+        path = os.path.join(CACHE_DIR, f"opening_{OPENING_VERSION}_top{top_k}_{self._key}.npz")
+        if os.path.exists(path):
+            return str(np.load(path)["opening"])
+
+        self.update_frequencies()
+        opening = self.frequency_guess_non_word(top_k=top_k)
+
+        save_cache(path, np.savez, opening=opening)
+        return opening
+
+    def load_pattern_matrix(self, chunk_size=256):
+        """
+        Load the pattern matrix of the word list from disk, computing it on the first run.
+        """
+        path = os.path.join(CACHE_DIR, f"patterns_base4_{self._key}.npy")
+        if os.path.exists(path):
+            return np.load(path, mmap_mode='r')
+
+        # Compute it in chunks of sources to bound memory usage, spread over threads
+        n_words = len(self._letters)
+        P = np.empty((n_words, n_words), dtype=np.uint16)
+
+        def fill(start):
+            P[start:start + chunk_size] = get_matches(self._letters[start:start + chunk_size], self._letters)
+
+        parallel_map(fill, range(0, n_words, chunk_size))
+
+        save_cache(path, np.save, P)
+        return P
 
     def get_guess(self, result):
         """
@@ -173,13 +409,10 @@ class Guesser:
         else:
             guess = self._get_guess()
         
-        # Avoid crashes
+        # Avoid crashes, e.g. with a short opening word on a tiny word list
         while (guess in self._tried
                or len(guess) != 5):
-            guess = np.random.choice(
-                list(''.join(self._tried)),
-                size=5)
-            guess = ''.join(guess)
+            guess = ''.join(choices(''.join(self._tried) or string.ascii_lowercase, k=5))
 
         self._tried.append(guess)
         self.console.print(guess)
@@ -187,7 +420,7 @@ class Guesser:
 
     def subset_trie(self, result):
         """
-        Update the word trie based on feedback string.
+        Update the mask of remaining words based on feedback string.
         """
         if not self._tried:
             return
@@ -198,156 +431,148 @@ class Guesser:
 
         guess = self._tried[-1]
 
-        # Initialize feedback containers
-        self.yellow = Counter()
-        self.gray = set()
-        self.green_pos = {}
-        self.gray_pos = {}
+        # Letters allowed at each position, like the transitions of a trie level
+        allowed = np.ones((5, 26), dtype=bool)
+
+        # Occurrences of each letter known from the feedback,
+        # exact whenever one of its occurrences is gray
+        self._hits = hits = np.zeros(26, dtype=np.int8)
+        exact = np.zeros(26, dtype=bool)
 
         # Process feedback from result
         for i, letter in enumerate(guess):
+            c = ord(letter) - ord('a')
             if result[i] == "+":
-                self.gray.add(letter)
-                self.gray_pos[i] = letter
+                allowed[i, c] = False
+                exact[c] = True
             elif result[i] == "-":
-                self.yellow.update([letter])
-                self.gray_pos[i] = letter
+                allowed[i, c] = False
+                hits[c] += 1
             elif result[i].isalpha():
-                self.green_pos[i] = letter
-
-        # Choose parent trie
-        parent_trie = self.word_trie if hasattr(self, 'word_trie') and self.word_trie else self._word_trie
-
-        # Generate new filtered trie
-        self.word_trie = parent_trie.filter_words(
-            gray=self.gray,
-            gray_pos=self.gray_pos,
-            yellow=self.yellow,
-            green_pos=self.green_pos,
-            guess=guess,
-        )
-        self.word_list = self.word_trie.list
+                allowed[i] = False
+                allowed[i, c] = True
+                hits[c] += 1
+
+        # Only the remaining words are checked, since filters can only restrict them further
+        ids = self._ids
+        letters = self._letters[ids]
+        has = self._has[ids]
+
+        # Check all the positions at once by looking up the words in the table,
+        # position-major so that the lookups are reduced over rows
+        keep = allowed.ravel()[letters.T + 26 * np.arange(5)[:, None]].all(axis=0)
+
+        # Check absent and present letters at once on the bitmasks
+        bits = np.uint32(1) << np.arange(26, dtype=np.uint32)
+        absent = np.bitwise_or.reduce(bits[exact & (hits == 0)])
+        present = np.bitwise_or.reduce(bits[hits > 0])
+        keep &= (has & absent) == 0
+        keep &= (has & present) == present
+
+        # Only repeated or capped letters need the actual counts
+        for c in np.flatnonzero((hits > 1) | (exact & (hits > 0))):
+            count = (letters == c).sum(axis=1)
+            keep &= count == hits[c] if exact[c] else count >= hits[c]
+
+        # Prune the mask in place
+        self._mask[ids[~keep]] = False
+        self._ids = ids[keep]
 
     def update_frequencies(self, abs=True, pos=True):
         """
         Update absolute and by-position frequency of letters.
         """
-        if not self.word_list:
+        if not len(self._ids):
             return
+
+        letters = self._letters[self._ids]
             
         # Letter Frequencies
         if abs:
-            self.letter_frequency_abs = Counter(''.join(self.word_list))
+            self.letter_frequency_abs = np.bincount(letters.ravel(), minlength=26)
 
-        # Letter Frequencies by Position
+        # Letter Frequencies by Position, with a single bincount over the offset columns
         if pos:
-            self.letter_frequency_pos = {}
-
-            for i in range(5):
-                self.letter_frequency_pos[i] = Counter(word[i] for word in self.word_list)
+            offsets = 26 * np.arange(5)
+            self.letter_frequency_pos = np.bincount((letters + offsets).ravel(), minlength=5 * 26).reshape(5, 26)
 
     def get_shortcut_words(self):
         """
         Synthetically create words joining the remaining letters not yet tried.
         """
-        # Calculate letters left only once
-        unique_letters = set(self.letter_frequency_abs.keys())
-        green_letters = set(self.green_pos.values())
-        yellow_letters = set(self.yellow.keys())
-        letters_left = unique_letters - green_letters - yellow_letters
+        # Letters of the remaining words that were neither green nor yellow in the last feedback
+        letters_left = list(decode(np.flatnonzero((self.letter_frequency_abs > 0) & (self._hits == 0))))
         
-        if len(letters_left) > 5:
+        if len(letters_left) > 5 or not letters_left:
             return []
         
         # Create words to exhaust all letters
-        shortcut_word = ''.join(sorted(letters_left, key=lambda x: random()))
-        letters_left = list(letters_left)
+        shortcut_word = ''.join(sample(letters_left, len(letters_left)))
         if len(shortcut_word) < 5:
-            shortcut_word += ''.join(
-                np.random.choice(
-                    letters_left,
-                    size = 5 - len(shortcut_word)
-                    ).tolist()
-                )
+            shortcut_word += ''.join(choices(letters_left, k=5 - len(shortcut_word)))
         
         return [shortcut_word]
 
-    def get_max_entropy_word(self, sources, targets):
+    def get_max_entropy_word(self, sources, targets, shortcut_words=()):
         """
         Return the word with highest entropy among the provided ones.
+        Sources and targets are given as indices in the word list, shortcut words as strings.
         """
-        max_entropy = float("-inf")
-        best_guess = ""
-        tot_counts = len(targets)
-        
         # Exit early if no targets
-        if tot_counts == 0:
-            return sources[0] if sources else "", 0
-        
-        # Pre-compute log2 values for all possible probabilities
-        log2_cache = {1/tot_counts: np.log2(1/tot_counts)}
-        
-        for w1 in sources:
-            # Get all patterns and store the occurrences
-            pattern_distribution = Counter()
-            
-            # Initialize cache for this word if needed
-            if w1 not in self._pattern_cache:
-                self._pattern_cache[w1] = {}
-            cur = self._pattern_cache[w1]
-            
-            # Calculate pattern distribution
-            for w2 in targets:
-                if w2 not in cur:
-                    cur[w2] = get_matches(w1, w2)
-                pattern_distribution[cur[w2]] += 1
-            
-            # Compute entropy efficiently
-            entropy = 0
-            for count in pattern_distribution.values():
-                prob = count / tot_counts
-                # Cache log computations
-                if prob not in log2_cache:
-                    log2_cache[prob] = np.log2(prob)
-                entropy -= prob * log2_cache[prob]
-
-            # Update best guess
-            if entropy > max_entropy:
-                best_guess = w1
-                max_entropy = entropy
-
-        return best_guess, max_entropy
-
-    def frequency_guess_non_word(self):
+        if len(targets) == 0:
+            return decode(self._letters[sources[0]]) if len(sources) else "", 0
+
+        # Read the patterns of the words from the pattern matrix
+        entropies, max_groups = get_entropies(self._P[np.ix_(sources, targets)])
+        solutions = np.isin(sources, targets)
+
+        # Compute the patterns of the shortcut words on the fly,
+        # unless a word already reaches the maximum entropy
+        if len(shortcut_words) and np.max(entropies, initial=-np.inf) < get_ceiling(len(targets)) - 1e-9:
+            shortcut_entropies, shortcut_max_groups = score_words(encode(shortcut_words), self._letters[targets])
+            entropies = np.concatenate([entropies, shortcut_entropies])
+            max_groups = np.concatenate([max_groups, shortcut_max_groups])
+            shortcut_solutions = np.isin(pack(encode(shortcut_words)), pack(self._letters[targets]))
+            solutions = np.concatenate([solutions, shortcut_solutions])
+
+        # Break ties on the largest group, then prefer words that could be the solution
+        best = get_best(entropies, max_groups, solutions)
+        if best < len(sources):
+            return decode(self._letters[sources[best]]), entropies[best]
+        return shortcut_words[best - len(sources)], entropies[best]
+
+    def frequency_guess_non_word(self, top_k=3):
         """
-        Return the combination of top 3 letters by position whose entropy is the highest.
+        Return the combination of top_k letters by position whose entropy is the highest.
         """
+        # The guess only depends on the remaining words and top_k, reuse it across games
+        key = (top_k, np.packbits(self._mask).tobytes())
+        if key in self._frequency_guesses:
+            return self._frequency_guesses[key]
+
         # Get position-based frequencies
-        letters_by_position = []
-        for i in range(5):
-            i_freqs = self.letter_frequency_pos[i]
-            letters_by_position.append([k for k, v in i_freqs.most_common(3)])
+        letters_by_position = [most_common(self.letter_frequency_pos[i], top_k) for i in range(5)]
 
         # Generate candidates with no repeated letters
-        candidates = []
-        
-        # Generate candidates using top letters
-        for combination in product(*letters_by_position):
-            if len(set(combination)) == 5:  # No repeated letters
-                candidates.append(''.join(combination))
+        candidates = get_combinations(letters_by_position)
         
         # If no candidates, combine top letters by frequency and return it
-        if not candidates:
-            return ''.join(k for k,v in self.letter_frequency_abs.most_common(5))
-            
-        guess, _ = self.get_max_entropy_word(candidates, self.word_list)
+        if not len(candidates):
+            guess = decode(most_common(self.letter_frequency_abs, 5))
+        else:
+            remaining = self._letters[self._ids]
+            entropies, max_groups = score_words(candidates, remaining)
+            # Generated combinations may spell a remaining word, which wins ties
+            solutions = np.isin(pack(candidates), pack(remaining))
+            guess = decode(candidates[get_best(entropies, max_groups, solutions)])
 
+        self._frequency_guesses[key] = guess
         return guess
 
     
     def _get_guess(self):
         self.update_frequencies()
-        remaining_words = len(self.word_list)
+        remaining_words = len(self._ids)
         
         # Early return for empty word list
         if remaining_words == 0:
@@ -355,7 +580,7 @@ class Guesser:
         
         # If only one word left, return it immediately
         if remaining_words == 1:
-            return self.word_list[0]
+            return decode(self._letters[self._ids[0]])
         
         # Use entropy when the list is manageable
         if remaining_words < 50:
@@ -366,8 +591,9 @@ class Guesser:
                 
             # Find word with maximum entropy
             guess, entropy = self.get_max_entropy_word(
-                sources=self.word_list + shortcut_words, 
-                targets=self.word_list
+                sources=self._ids,
+                targets=self._ids,
+                shortcut_words=shortcut_words,
             )
             
             # Use entropy-based guess if it's close to optimal
@@ -1,52 +1,87 @@
 import sys
+import time
 import yaml
-import subprocess
-import re
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
 
 import numpy as np
 
-if len(sys.argv) > 2:
+from wordle import Wordle
+from guesser import Guesser, decode, load_wordlist, set_num_threads
+from game import Game, blockPrint
 
-    N_INIT = (sys.argv[1])
-    N_WORDS = sys.argv[2]
+def init_worker():
+    # Build the guesser once per process, so the word list, pattern matrix
+    # and opening word are loaded once instead of once per run.
+    # Processes already fill the cores, so each one uses a single thread
+    global guesser, wordle
+    blockPrint()
+    set_num_threads(1)
+    guesser = Guesser('console')
+    wordle = Wordle()
 
-else:
-    N_INIT = input('N_INIT: ')
-    N_WORDS = input('N_WORDS: ')
+def run(args):
+    # Play the sampled answers on the sampled list, in-process.
+    # The time covers the whole run, including the setup of the guesser on the list
+    word_list, answers = args
+    start_time = time.time()
+    guesser.set_word_list(word_list)
+    game = Game()
+    for answer in answers:
+        game.simulate(wordle, guesser, answer=answer)
 
-N_INIT, N_WORDS, N_GAMES = int(N_INIT), int(N_WORDS), 500
+    accuracy = 100 * np.mean(game.RESULTS)
+    avg_length = np.mean(game.GUESSES)
+    return accuracy, avg_length, time.time() - start_time
 
-input('Press enter to start: ')
+if __name__ == '__main__':
 
-_word_list = yaml.load(open('wordlist.yaml'), Loader=yaml.FullLoader)
+    if len(sys.argv) > 2:
 
-stats = np.zeros(shape=(N_INIT, 3))
+        N_INIT = (sys.argv[1])
+        N_WORDS = sys.argv[2]
 
-for i in range(N_INIT):
-    
-    print(f"Run {i+1}: ")
-    word_list = np.random.choice(
-        _word_list,
-        size = N_WORDS,
-        replace=False
-        ).tolist()
-    
-    with open('r_wordlist.yaml', 'w') as f:
-        yaml.dump(word_list, f)
+    else:
+        N_INIT = input('N_INIT: ')
+        N_WORDS = input('N_WORDS: ')
+
+    N_INIT, N_WORDS, N_GAMES = int(N_INIT), int(N_WORDS), 500
+
+    input('Press enter to start: ')
 
-    # Run the game
-    out = subprocess.run(["python", "game.py", "--r", str(N_GAMES)], capture_output=True)
-    accuracy, avg_length, time = re.sub(r'[a-z\\\'%]', '', str(out.stdout)).split(',')
-    accuracy, avg_length, time = float(accuracy), float(avg_length), float(time)
-    stats[i, :] = [accuracy, avg_length, time]
+    _word_list = decode(load_wordlist('wordlist.yaml'))
+
+    samples = []
+    for i in range(N_INIT):
+        word_list = np.random.choice(
+            _word_list,
+            size = N_WORDS,
+            replace=False
+            ).tolist()
+        # Draw the answers of the games at random from the list, like Wordle does
+        answers = np.random.choice(word_list, size=N_GAMES).tolist()
+        samples.append((word_list, answers))
+
+    # Save the last sample, so it can be played on with game.py
+    with open('r_wordlist.yaml', 'w') as f:
+        yaml.dump(samples[-1][0], f)
 
-    print(f"{accuracy:.2f}%,{avg_length:.4f},{time:.2f}")
+    # Fill the cache once here, so the workers only load finished files
+    Guesser('console')
 
-print()
-print(f"Completed {N_INIT} runs.\n\nAverage metrics: ")
-print(f"Accuracy = {np.mean(stats[:, 0]):.2f}% ({np.std(stats[:, 0]):.2f})")
-print(f"Length = {np.mean(stats[:, 1]):.4f} ({np.std(stats[:, 1]):.4f})")
-print(f"Time = {np.mean(stats[:, 2]):.4f} ({np.std(stats[:, 2]):.4f})")
+    stats = np.zeros(shape=(N_INIT, 3))
 
+    # Run the games, one process per core; spawn them rather than forking
+    # this process, whose kernel threads may already be running
+    context = multiprocessing.get_context('spawn')
+    with ProcessPoolExecutor(mp_context=context, initializer=init_worker) as executor:
+        for i, (accuracy, avg_length, run_time) in enumerate(executor.map(run, samples)):
+            stats[i, :] = [accuracy, avg_length, run_time]
+            print(f"Run {i+1}: ")
+            print(f"{accuracy:.2f}%,{avg_length:.4f},{run_time:.2f}")
 
-        
\ No newline at end of file
+    print()
+    print(f"Completed {N_INIT} runs.\n\nAverage metrics: ")
+    print(f"Accuracy = {np.mean(stats[:, 0]):.2f}% ({np.std(stats[:, 0]):.2f})")
+    print(f"Length = {np.mean(stats[:, 1]):.4f} ({np.std(stats[:, 1]):.4f})")
+    print(f"Time = {np.mean(stats[:, 2]):.4f} ({np.std(stats[:, 2]):.4f})")
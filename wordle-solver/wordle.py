@@ -6,7 +6,7 @@ class Wordle():
     
     global ALLOWED_GUESSES, word_list
     ALLOWED_GUESSES = 6
-    word_list = yaml.load(open('wordlist.yaml'), Loader=yaml.FullLoader)
+    word_list = yaml.load(open('wordlist.yaml'), Loader=getattr(yaml, 'CSafeLoader', yaml.SafeLoader))
     
     # comment this out for development, use for testing / marking
     # seed(42)
@@ -15,8 +15,8 @@ class Wordle():
         self._word = choice(word_list)
         self._tried = []
 
-    def restart_game(self, random_state=None):
-        self._word = choice(word_list)
+    def restart_game(self, random_state=None, word=None):
+        self._word = word if word else choice(word_list)
         self._tried = []
         self._endgame = False
 